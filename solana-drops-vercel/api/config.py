@@ -1,11 +1,15 @@
 # api/config.py
 from __future__ import annotations
 import os
+from functools import lru_cache
+from types import MappingProxyType
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-app = FastAPI(title="Solana Drops — Config API")
-def _cfg():
-    return {
+from fastapi.responses import ORJSONResponse
+app = FastAPI(title="Solana Drops — Config API", default_response_class=ORJSONResponse)
+# env не меняется за время жизни процесса — парсим один раз; _cfg_raw.cache_clear() для сброса
+@lru_cache(maxsize=1)
+def _cfg_raw():
+    return MappingProxyType({
         "VOLUME_MIN": float(os.getenv("VOLUME_MIN", "100000")),
         "VOLUME_MAX": float(os.getenv("VOLUME_MAX", "100000000")),
         "PRICE_THRESHOLD_PCT": float(os.getenv("PRICE_THRESHOLD_PCT", "85")),
@@ -17,8 +21,12 @@ def _cfg():
         "MAX_PAGES": int(os.getenv("MAX_PAGES", "8")),
         "PAGE_DELAY_S": float(os.getenv("PAGE_DELAY_S", "0.2")),
         "ATH_FALLBACK_USE_POOLMAX": os.getenv("ATH_FALLBACK_USE_POOLMAX", "0").strip().lower() in {"1","true","yes","y","on"},
-        "SOLANATRACKER_API_KEY": "****" if os.getenv("SOLANATRACKER_API_KEY","") else "",
-    }
+        "SOLANATRACKER_API_KEY": os.getenv("SOLANATRACKER_API_KEY",""),
+    })
+def _cfg():
+    cfg = dict(_cfg_raw())
+    cfg["SOLANATRACKER_API_KEY"] = "****" if cfg["SOLANATRACKER_API_KEY"] else ""
+    return cfg
 @app.get("/")
 def config():
-    return JSONResponse(_cfg())
+    return _cfg()
@@ -1,14 +1,30 @@
 from __future__ import annotations
-import os
-from typing import Optional, List
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
-from .scanner import scan_once
+import asyncio, os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AsyncIterator, Optional, List, Tuple
+from fastapi import Depends, FastAPI, Query, Request
+from fastapi.responses import ORJSONResponse
+from .scanner import AsyncDexClient, STClient, close_clients, get_dex_client, get_st_client, scan_once
 
-app = FastAPI(title="Solana Drops — Scan API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # клиенты создаются на старте инстанса и закрываются при остановке
+    app.state.dex = get_dex_client()
+    app.state.st = get_st_client(_cfg()["SOLANATRACKER_API_KEY"])
+    try:
+        yield
+    finally:
+        app.state.dex = app.state.st = None
+        await close_clients()
 
+app = FastAPI(title="Solana Drops — Scan API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# env не меняется за время жизни процесса — парсим один раз; _cfg.cache_clear() для сброса
+@lru_cache(maxsize=1)
 def _cfg():
-    return {
+    return MappingProxyType({
         "VOLUME_MIN": float(os.getenv("VOLUME_MIN", "100000")),
         "VOLUME_MAX": float(os.getenv("VOLUME_MAX", "100000000")),
         "PRICE_THRESHOLD_PCT": float(os.getenv("PRICE_THRESHOLD_PCT", "85")),
@@ -21,34 +37,52 @@ def _cfg():
         "PAGE_DELAY_S": float(os.getenv("PAGE_DELAY_S", "0.2")),
         "ATH_FALLBACK_USE_POOLMAX": os.getenv("ATH_FALLBACK_USE_POOLMAX", "0").strip().lower() in {"1","true","yes","y","on"},
         "SOLANATRACKER_API_KEY": os.getenv("SOLANATRACKER_API_KEY", ""),
-    }
+    })
+
+async def _clients(request: Request) -> AsyncIterator[Tuple[AsyncDexClient, Optional[STClient]]]:
+    dex = getattr(request.app.state, "dex", None)
+    if dex is not None:
+        yield dex, request.app.state.st
+        return
+    # lifespan не запускался: запросы могут идти в разных циклах событий,
+    # а клиенты к циклу привязаны — создаём их на запрос и закрываем за собой
+    key = _cfg()["SOLANATRACKER_API_KEY"]
+    dex = AsyncDexClient(); st = STClient(key) if key else None
+    try:
+        yield dex, st
+    finally:
+        await asyncio.gather(dex.aclose(), *([st.aclose()] if st else []))
 
-def _run_scan(pages: Optional[int], seeds: Optional[str], debug: bool):
+async def _run_scan(pages: Optional[int], seeds: Optional[str], debug: bool,
+                    clients: Tuple[AsyncDexClient, Optional[STClient]]):
     cfg = _cfg()
     if seeds:
+        cfg = dict(cfg)
         cfg["SEARCH_SEEDS"] = seeds
         # если явно задали seeds — ограничим страницы до их количества
         cfg["MAX_PAGES"] = min(len([s for s in seeds.split(",") if s.strip()]), pages or cfg["MAX_PAGES"])
-    return scan_once(
+    return await scan_once(
         volume_min=cfg["VOLUME_MIN"], volume_max=cfg["VOLUME_MAX"],
         price_threshold_pct=cfg["PRICE_THRESHOLD_PCT"], liq_min_usd=cfg["LIQ_MIN_USD"],
         mcap_min=cfg["MCAP_MIN"], mcap_max=cfg["MCAP_MAX"],
         seeds_from_env=cfg["SEARCH_SEEDS"], max_pages=pages or cfg["MAX_PAGES"],
         min_seed_len=cfg["SEARCH_MIN_Q_LEN"], page_delay_s=cfg["PAGE_DELAY_S"],
         st_api_key=cfg["SOLANATRACKER_API_KEY"], use_proxy_poolmax=cfg["ATH_FALLBACK_USE_POOLMAX"],
-        debug=debug
+        debug=debug, dex=clients[0], st=clients[1]
     )
 
 # POST как и раньше
 @app.post("/")
-def scan_post(pages: int | None = Query(default=None, ge=1, le=40),
-              seeds: str | None = Query(default=None),
-              debug: bool = Query(default=False)):
-    return JSONResponse(_run_scan(pages, seeds, debug))
+async def scan_post(pages: int | None = Query(default=None, ge=1, le=40),
+                    seeds: str | None = Query(default=None),
+                    debug: bool = Query(default=False),
+                    clients: Tuple[AsyncDexClient, Optional[STClient]] = Depends(_clients)):
+    return await _run_scan(pages, seeds, debug, clients)
 
 # Добавим GET для удобной проверки из браузера
 @app.get("/")
-def scan_get(pages: int | None = Query(default=None, ge=1, le=40),
-             seeds: str | None = Query(default=None),
-             debug: bool = Query(default=False)):
-    return JSONResponse(_run_scan(pages, seeds, debug))
+async def scan_get(pages: int | None = Query(default=None, ge=1, le=40),
+                   seeds: str | None = Query(default=None),
+                   debug: bool = Query(default=False),
+                   clients: Tuple[AsyncDexClient, Optional[STClient]] = Depends(_clients)):
+    return await _run_scan(pages, seeds, debug, clients)
@@ -1,21 +1,17 @@
 # api/scanner.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import math, os, time
-from dataclasses import dataclass, asdict
+import asyncio, logging, math, operator, os, threading, time, weakref
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional, Tuple
-import requests
+import httpx
 try:
-    from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
+    from orjson import loads as _loads
 except Exception:  # pragma: no cover
-    def retry(*a, **k): 
-        def d(f): return f
-        return d
-    def stop_after_attempt(*a, **k): return None
-    def wait_exponential_jitter(*a, **k): return None
-    def retry_if_exception_type(*a, **k): return None
-
-@dataclass
+    from json import loads as _loads
+
+@dataclass(slots=True, frozen=True)
 class PairRow:
     timestamp: str
     tokenName: str
@@ -29,15 +25,33 @@ class PairRow:
     liquidityUsd: float
     dexLink: str
 
+# у slots-датакласса нет __dict__; asdict() делает deepcopy — собираем dict через attrgetter
+PAIR_ROW_FIELDS = tuple(f.name for f in fields(PairRow))
+_pair_row_values = operator.attrgetter(*PAIR_ROW_FIELDS)
+def pair_row_dict(r: PairRow) -> Dict[str, Any]:
+    return dict(zip(PAIR_ROW_FIELDS, _pair_row_values(r)))
+
 def safe_float(x: Any, default: Optional[float] = None) -> Optional[float]:
     if x is None: return default
+    t = type(x)
+    # JSON почти всегда отдаёт числа — обходимся без str()/strip()/lower(); NaN ловим через x == x
+    if t is float: return x if x == x else default
+    if t is bool: return default
     try:
-        s = str(x).strip()
-        if s.lower() in {'nan','none',''}: return default
-        return float(s)
-    except Exception:
+        if t is int: return float(x)
+        r = float(x)  # строки: float() сам срезает пробелы, "nan" даёт NaN, "none"/"" — ValueError
+        return r if r == r else default
+    except (TypeError, ValueError, OverflowError):
         return default
 
+log = logging.getLogger(__name__)
+
+_MISSING: Any = object()
+
+def _dig(p: Dict[str, Any], k1: str, k2: str) -> Any:
+    v = p.get(k1)
+    return v.get(k2) if v else None
+
 DEX_BASE = "https://api.dexscreener.com"
 DEX_WEB = "https://dexscreener.com"
 CHAIN_ID = "solana"
@@ -46,101 +60,230 @@ ENDPOINT_PAIR   = f"{DEX_BASE}/latest/dex/pairs/{CHAIN_ID}"
 ENDPOINT_TOKENS = f"{DEX_BASE}/tokens/v1/{CHAIN_ID}"
 ST_BASE = os.getenv("SOLANATRACKER_BASE", "https://data.solanatracker.io").rstrip("/")
 
-class DexClient:
+# Ретраи (единственный слой — _AsyncHTTP._get): до 3 повторов на 429/5xx и сетевые ошибки.
+# Паузы 0.5+1+2s; Retry-After соблюдаем, но не дольше 8s на повтор (в сумме не больше 24s),
+# плюс таймаут каждой из 4 попыток
+RETRY_TOTAL = 3
+RETRY_BACKOFF_S = 0.5
+RETRY_AFTER_MAX_S = 8.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def _retry_delay(r: Optional[httpx.Response], attempt: int) -> float:
+    ra = r.headers.get("Retry-After") if r is not None else None
+    if ra and ra.strip().isdigit(): return min(float(ra), RETRY_AFTER_MAX_S)
+    return RETRY_BACKOFF_S * (2 ** attempt)
+
+SEARCH_WORKERS = 8  # одновременных запросов /search за один скан
+# Пулы по числу одновременных запросов: до SEARCH_WORKERS поисков (семафор в scan_once)
+# плюс один запрос по кандидату — они проверяются по одному. По HTTP/2 всё идёт в одно соединение,
+# пул нужен на случай отката на HTTP/1.1: меньший — лишние соединения открываются и выбрасываются.
+DEX_POOL_SIZE = SEARCH_WORKERS + 1
+ST_POOL_SIZE = 4
+THROTTLE_WINDOW_S = 60.0
+
+def _client(headers: Dict[str, str], pool_size: int, timeout: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_keepalive_connections=pool_size, max_connections=pool_size)
+    # у transport свои ретраи не включаем — все повторы делает _AsyncHTTP._get
+    return httpx.AsyncClient(timeout=timeout, headers=headers,
+                             transport=httpx.AsyncHTTPTransport(http2=True, limits=limits))
+
+class _AsyncHTTP:
+    def __init__(self, s: httpx.AsyncClient):
+        self.s = s
+        self.last_429 = float("-inf")
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        for attempt in range(RETRY_TOTAL+1):
+            try:
+                r = await self.s.get(url, params=params)
+            except httpx.TransportError:
+                if attempt==RETRY_TOTAL: raise
+                await asyncio.sleep(_retry_delay(None, attempt)); continue
+            if r.status_code == 429: self.last_429 = time.monotonic()
+            if r.status_code not in RETRY_STATUSES or attempt==RETRY_TOTAL: break
+            await asyncio.sleep(_retry_delay(r, attempt))
+        return r
+    async def aclose(self) -> None:
+        await self.s.aclose()
+
+class AsyncDexClient(_AsyncHTTP):
     def __init__(self, timeout: int = 15):
-        self.s = requests.Session()
-        self.s.headers.update({"Accept":"application/json","User-Agent":"solana-drops-vercel/1.0"})
-        self.timeout = timeout
-    @retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential_jitter(initial=1,max=15),
-           retry=retry_if_exception_type((requests.RequestException,)))
-    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        r = self.s.get(url, params=params, timeout=self.timeout)
-        if r.status_code in (429,500,502,503,504):
-            raise requests.RequestException(f"{r.status_code}")
+        # HTTP/2: все seeds мультиплексируются поверх одного соединения к api.dexscreener.com
+        super().__init__(_client({"Accept":"application/json","User-Agent":"solana-drops-vercel/1.0"}, DEX_POOL_SIZE, timeout))
+        self._next_slot = 0.0
+    async def throttle(self, interval: float) -> None:
+        # темп 1 запрос / interval включаем, только если за последнюю минуту ловили 429
+        if interval<=0 or time.monotonic()-self.last_429>THROTTLE_WINDOW_S: return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot+interval
+        if slot>now: await asyncio.sleep(slot-now)
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        r = await self._get(url, params)
         r.raise_for_status()
-        return r.json()
+        return _loads(r.content)
 
-class STClient:
+class STClient(_AsyncHTTP):
     def __init__(self, api_key: str, timeout: int = 15):
-        import requests
-        self.s = requests.Session()
-        self.s.headers.update({"Accept":"application/json","x-api-key":api_key.strip(),"User-Agent":"solana-drops-vercel/1.0"})
+        super().__init__(_client({"Accept":"application/json","x-api-key":api_key.strip(),"User-Agent":"solana-drops-vercel/1.0"},
+                                 ST_POOL_SIZE, timeout))
         self.base = ST_BASE
-        self.timeout = timeout
         self.unauthorized = False
-    @retry(reraise=True, stop=stop_after_attempt(4), wait=wait_exponential_jitter(initial=1,max=10),
-           retry=retry_if_exception_type((requests.RequestException,)))
-    def get_token_ath(self, mint: str) -> Optional[float]:
-        url = f"{self.base}/tokens/{mint}/ath"
-        r = self.s.get(url, timeout=self.timeout)
-        if r.status_code == 401: self.unauthorized=True; return None
+    async def get_token_ath(self, mint: str) -> Optional[float]:
+        if self.unauthorized: return None
+        r = await self._get(f"{self.base}/tokens/{mint}/ath")
+        if r.status_code == 401:
+            # флаг живёт вместе с клиентом (см. get_st_client), так что пишем в лог один раз на ключ
+            log.warning("Solanatracker: 401, ATH fallback disabled for this key")
+            self.unauthorized=True; return None
         if r.status_code == 404: return None
-        if r.status_code in (429,500,502,503,504): raise requests.RequestException(f"{r.status_code}")
         r.raise_for_status()
-        return safe_float(r.json().get("highest_price"))
+        return safe_float(_loads(r.content).get("highest_price"))
+
+# Клиенты живут, пока жив цикл событий: пул соединений и TLS переиспользуются между запросами.
+# httpx.AsyncClient привязан к циклу, в котором открыл соединения, поэтому набор клиентов — свой на каждый цикл.
+class _LoopClients:
+    __slots__ = ("dex", "st", "__weakref__")
+    def __init__(self):
+        self.dex: Optional[AsyncDexClient] = None
+        self.st: Dict[str, STClient] = {}
+
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
+def _loop_clients() -> _LoopClients:
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        lc = _CLIENTS.get(loop)
+        if lc is None: lc = _CLIENTS[loop] = _LoopClients()
+        return lc
+
+def get_dex_client() -> AsyncDexClient:
+    lc = _loop_clients()
+    if lc.dex is None: lc.dex = AsyncDexClient()
+    return lc.dex
+
+def get_st_client(api_key: str) -> Optional[STClient]:
+    if not api_key: return None
+    lc = _loop_clients()
+    st = lc.st.get(api_key)
+    if st is None: st = lc.st[api_key] = STClient(api_key)
+    return st
+
+async def close_clients() -> None:
+    # закрывает клиентов текущего цикла событий
+    with _CLIENTS_LOCK:
+        lc = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if lc is None: return
+    clients: List[_AsyncHTTP] = [c for c in (lc.dex,) if c is not None] + list(lc.st.values())
+    await asyncio.gather(*(c.aclose() for c in clients))
 
 DEFAULT_SEEDS = [chr(c)+chr(d) for c in range(ord('a'), ord('z')+1) for d in range(ord('a'), ord('z')+1)]
+@lru_cache(maxsize=32)
+def _parse_seeds(seeds_from_env: str, min_len: int) -> Tuple[str, ...]:
+    # повторяющиеся seeds дают одну и ту же выдачу — оставляем первое вхождение
+    return tuple(dict.fromkeys(s for s in (s.strip() for s in seeds_from_env.split(',')) if len(s)>=min_len))
+
 def _get_seeds(max_pages: int, seeds_from_env: str, min_len: int) -> List[str]:
     if seeds_from_env:
-        seeds=[s.strip() for s in seeds_from_env.split(',') if len(s.strip())>=min_len]
+        seeds=list(_parse_seeds(seeds_from_env, min_len))
     else:
         seeds=[s for s in DEFAULT_SEEDS if len(s)>=min_len]
     return seeds[:max_pages] if max_pages>0 else seeds
 
-def fetch_pairs_page(client: DexClient, page: int, seeds: List[str]) -> List[Dict[str, Any]]:
+async def fetch_pairs_page(client: AsyncDexClient, page: int, seeds: List[str]) -> List[Dict[str, Any]]:
     if page<1 or page>len(seeds): return []
     seed = seeds[page-1]
-    data = client.get_json(ENDPOINT_SEARCH, params={"q": seed})
-    raw = data.get("pairs") or []
-    return [p for p in raw if (p.get("chainId") or "").lower()==CHAIN_ID]
+    data = await client.get_json(ENDPOINT_SEARCH, params={"q": seed})
+    # фильтруем сразу: ошибки разбора остаются ошибками этого seed, а сырой ответ освобождается до конца скана
+    return [p for p in data.get("pairs") or () if (p.get("chainId") or "").lower()==CHAIN_ID]
+
+async def _fetch_seed_page(client: AsyncDexClient, page: int, seeds: List[str], page_delay_s: float,
+                           sem: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    async with sem:
+        await client.throttle(page_delay_s)  # без недавних 429 — сразу
+        return await fetch_pairs_page(client, page, seeds)
+
+def _prefilter(chunk: List[Dict[str, Any]], *, volume_min: float, volume_max: float,
+               liq_min_usd: float, mcap_min: float, mcap_max: float) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for p in chunk:
+        # vol/liq отсекают большинство пар — mcap разбираем только для прошедших
+        vol=safe_float(_dig(p,'volume','h24'))
+        if vol is None or vol<volume_min or vol>volume_max: continue
+        liq=safe_float(_dig(p,'liquidity','usd'))
+        if liq is None or liq<liq_min_usd: continue
+        inline_mcap = safe_float(p.get('marketCap')) or safe_float(p.get('fdv'))
+        if inline_mcap is not None and not (mcap_min<=inline_mcap<=mcap_max): continue
+        # разобранные числа едут дальше вместе с парой (живут только в пределах запроса)
+        p["_parsed"] = (vol, liq, inline_mcap)
+        out.append(p)
+    return out
+
+def _parse_pair(p: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    # (vol, liq, inline_mcap) для пар, не прошедших _prefilter
+    return (safe_float(_dig(p,"volume","h24")), safe_float(_dig(p,"liquidity","usd")),
+            safe_float(p.get("marketCap")) or safe_float(p.get("fdv")))
 
 def select_best_pair_by_token(pairs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-    best: Dict[str, Dict[str, Any]] = {}
+    # (liq, vol, pair): ключ сравнения лидера считаем один раз при вставке
+    best: Dict[str, Tuple[float, float, Dict[str, Any]]] = {}
     for p in pairs:
-        base = ((p.get("baseToken") or {}).get("address") or "").strip()
+        base = (_dig(p,"baseToken","address") or "").strip()
         if not base: continue
-        liq = safe_float(((p.get("liquidity") or {}).get("usd")),0) or 0.0
-        vol = safe_float(((p.get("volume") or {}).get("h24")),0) or 0.0
+        parsed = p.get("_parsed")
+        if parsed: vol, liq, _ = parsed
+        else: liq = safe_float(_dig(p,"liquidity","usd"),0.0); vol = safe_float(_dig(p,"volume","h24"),0.0)
         ex = best.get(base)
-        if not ex: best[base]=p; continue
-        liq0 = safe_float(((ex.get("liquidity") or {}).get("usd")),0) or 0.0
-        vol0 = safe_float(((ex.get("volume") or {}).get("h24")),0) or 0.0
-        if liq>liq0 or (liq==liq0 and vol>vol0): best[base]=p
-    return best
+        if ex is None: best[base]=(liq,vol,p); continue
+        liq0, vol0, _ = ex
+        if liq>liq0 or (liq==liq0 and vol>vol0): best[base]=(liq,vol,p)
+    return {k: v[2] for k, v in best.items()}
 
-def _fetch_token_pools(client: DexClient, token_addr: str) -> List[Dict[str, Any]]:
+async def _fetch_token_pools(client: AsyncDexClient, token_addr: str, cache: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     url=f"{ENDPOINT_TOKENS}/{token_addr}"
+    if cache is not None and url in cache: return cache[url]
+    pools: List[Dict[str, Any]] = []
     try:
-        data = client.get_json(url)
+        data = await client.get_json(url)
         if isinstance(data, list):
-            return [p for p in data if (p.get("chainId") or "").lower()==CHAIN_ID]
-        if isinstance(data, dict):
-            return [p for p in (data.get("pairs") or []) if (p.get("chainId") or "").lower()==CHAIN_ID]
+            pools = [p for p in data if (p.get("chainId") or "").lower()==CHAIN_ID]
+        elif isinstance(data, dict):
+            pools = [p for p in (data.get("pairs") or []) if (p.get("chainId") or "").lower()==CHAIN_ID]
     except Exception: pass
-    return []
+    if cache is not None: cache[url] = pools
+    return pools
 
-def _ensure_ath(dex: DexClient, pair: Dict[str, Any], st: Optional[STClient], use_proxy_poolmax: bool) -> Optional[float]:
-    ath = safe_float(((pair.get("allTimeHigh") or {}).get("price")))
+async def _fetch_pair(client: AsyncDexClient, pair_addr: str, cache: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    url=f"{ENDPOINT_PAIR}/{pair_addr}"
+    if cache is not None and url in cache: return cache[url]
+    pair: Optional[Dict[str, Any]] = None
+    try:
+        lst = (await client.get_json(url)).get("pairs") or []
+        if lst: pair = lst[0]
+    except Exception: pass
+    if cache is not None: cache[url] = pair
+    return pair
+
+async def _ensure_ath(dex: AsyncDexClient, pair: Dict[str, Any], st: Optional[STClient], use_proxy_poolmax: bool,
+                cache: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    ath = safe_float(_dig(pair,"allTimeHigh","price"))
     if ath and ath>0: return ath
     pair_addr = (pair.get("pairAddress") or "").strip()
     if pair_addr:
-        try:
-            details = dex.get_json(f"{ENDPOINT_PAIR}/{pair_addr}")
-            lst = details.get("pairs") or []
-            if lst:
-                a2 = safe_float(((lst[0].get("allTimeHigh") or {}).get("price")))
-                if a2 and a2>0: return a2
-        except Exception: pass
-    base_addr = ((pair.get("baseToken") or {}).get("address") or "").strip()
+        details = await _fetch_pair(dex, pair_addr, cache)
+        if details:
+            a2 = safe_float(_dig(details,"allTimeHigh","price"))
+            if a2 and a2>0: return a2
+    base_addr = (_dig(pair,"baseToken","address") or "").strip()
     tps: List[Dict[str, Any]] = []
     if base_addr:
-        tps = _fetch_token_pools(dex, base_addr)
-        ats=[safe_float(((tp.get('allTimeHigh') or {}).get('price'))) for tp in tps]
+        tps = await _fetch_token_pools(dex, base_addr, cache)
+        ats=[safe_float(_dig(tp,"allTimeHigh","price")) for tp in tps]
         ats=[a for a in ats if a and a>0]
         if ats: return max(ats)
-    if st and base_addr:
+    if st and not st.unauthorized and base_addr:
         try:
-            st_ath = st.get_token_ath(base_addr)
+            st_ath = await st.get_token_ath(base_addr)
             if st_ath and st_ath>0: return st_ath
         except Exception: pass
     if use_proxy_poolmax and tps:
@@ -149,14 +292,14 @@ def _ensure_ath(dex: DexClient, pair: Dict[str, Any], st: Optional[STClient], us
         if prices: return max(prices)  # proxy (not historical)
     return None
 
-def _resolve_market_cap(dex: DexClient, pair: Dict[str, Any]) -> Optional[float]:
+async def _resolve_market_cap(dex: AsyncDexClient, pair: Dict[str, Any], cache: Optional[Dict[str, Any]] = None) -> Optional[float]:
     m = safe_float(pair.get("marketCap"))
     if m and m>0: return m
     f = safe_float(pair.get("fdv"))
     if f and f>0: return f
-    base = ((pair.get("baseToken") or {}).get("address") or "").strip()
+    base = (_dig(pair,"baseToken","address") or "").strip()
     if not base: return None
-    tps=_fetch_token_pools(dex, base)
+    tps=await _fetch_token_pools(dex, base, cache)
     cands=[]
     for tp in tps:
         m = safe_float(tp.get("marketCap"))
@@ -165,10 +308,15 @@ def _resolve_market_cap(dex: DexClient, pair: Dict[str, Any]) -> Optional[float]
         elif f and f>0: cands.append(f)
     return max(cands) if cands else None
 
-def filter_candidates(pairs: Iterable[Dict[str, Any]], *, dex: DexClient,
+async def filter_candidates(pairs: Iterable[Dict[str, Any]], *, dex: AsyncDexClient,
     vol_min: float, vol_max: float, pct_threshold: float, liq_min_usd: float,
     mcap_min: float, mcap_max: float, st: Optional[STClient], use_proxy_poolmax: bool,
-    now_iso: str) -> Tuple[List[PairRow], Dict[str,int]]:
+    now_iso: str, cache: Optional[Dict[str, Any]] = None,
+    ath_cache: Optional[Dict[str, Optional[float]]] = None) -> Tuple[List[PairRow], Dict[str,int]]:
+    # cache: url -> разобранный ответ, общий для _resolve_market_cap и _ensure_ath в пределах скана
+    # ath_cache: mint -> ATH (ATH — свойство токена, а не пары)
+    if cache is None: cache = {}
+    if ath_cache is None: ath_cache = {}
     stats={"mcap_ok":0,"mcap_missing":0,"mcap_out":0,"ath_found":0,"ath_missing":0}
     rows: List[PairRow] = []
     for p in pairs:
@@ -178,18 +326,19 @@ def filter_candidates(pairs: Iterable[Dict[str, Any]], *, dex: DexClient,
         base_addr=(base.get("address") or "").strip()
         pair_addr=(p.get("pairAddress") or "").strip()
         price=safe_float(p.get("priceUsd"))
-        vol=safe_float(((p.get("volume") or {}).get("h24")))
-        liq=safe_float(((p.get("liquidity") or {}).get("usd")))
+        vol, liq, inline_mcap = p.get("_parsed") or _parse_pair(p)
         if not base_addr or price is None or vol is None or liq is None: continue
         if vol<vol_min or vol>vol_max: continue
         if liq<liq_min_usd: continue
-        mcap=_resolve_market_cap(dex,p)
+        mcap=inline_mcap if inline_mcap and inline_mcap>0 else await _resolve_market_cap(dex,p,cache)
         if mcap is None: stats["mcap_missing"]+=1; continue
         if not (mcap_min<=mcap<=mcap_max): stats["mcap_out"]+=1; continue
         stats["mcap_ok"]+=1
-        ath=safe_float(((p.get("allTimeHigh") or {}).get("price")))
+        ath=safe_float(_dig(p,"allTimeHigh","price"))
         if ath is None or ath<=0:
-            ath=_ensure_ath(dex,p,STClient(os.getenv('SOLANATRACKER_API_KEY','')) if os.getenv('SOLANATRACKER_API_KEY','') else None,use_proxy_poolmax)
+            ath=ath_cache.get(base_addr,_MISSING)
+            if ath is _MISSING:
+                ath=ath_cache[base_addr]=await _ensure_ath(dex,p,st,use_proxy_poolmax,cache)
         if ath is None or ath<=0: stats["ath_missing"]+=1; continue
         stats["ath_found"]+=1
         pct=float(price)/float(ath)
@@ -197,38 +346,40 @@ def filter_candidates(pairs: Iterable[Dict[str, Any]], *, dex: DexClient,
             rows.append(PairRow(now_iso, token_name, symbol, base_addr, pair_addr, float(price), float(ath), pct, float(vol), float(liq), f"{DEX_WEB}/{CHAIN_ID}/{pair_addr}" if pair_addr else f"{DEX_WEB}/{CHAIN_ID}"))
     return rows, stats
 
-def scan_once(*, volume_min:float, volume_max:float, price_threshold_pct:float, liq_min_usd:float,
-              mcap_min:float, mcap_max:float, seeds_from_env:str, max_pages:int, min_seed_len:int,
-              page_delay_s:float, st_api_key:str, use_proxy_poolmax:bool, debug: bool=False)->Dict[str,Any]:
+async def scan_once(*, volume_min:float, volume_max:float, price_threshold_pct:float, liq_min_usd:float,
+                    mcap_min:float, mcap_max:float, seeds_from_env:str, max_pages:int, min_seed_len:int,
+                    page_delay_s:float, st_api_key:str, use_proxy_poolmax:bool, debug: bool=False,
+                    dex: Optional[AsyncDexClient]=None, st: Optional[STClient]=None)->Dict[str,Any]:
     import datetime as _dt
-    dex=DexClient(); st=STClient(st_api_key) if st_api_key else None
+    if dex is None: dex=get_dex_client()
+    if st is None: st=get_st_client(st_api_key)
     seeds=_get_seeds(max_pages, seeds_from_env, min_seed_len)
-    fetched=0; prefiltered=[]; errors=[]
-    for idx in range(1,len(seeds)+1):
-        seed = seeds[idx-1]
-        try:
-            chunk = fetch_pairs_page(dex, idx, seeds)
-        except Exception as e:
-            chunk = []
-            errors.append({"seed": seed, "page": idx, "error": str(e)})
-        fetched += len(chunk)
-        for p in chunk:
-            vol=safe_float(((p.get('volume') or {}).get('h24'))); liq=safe_float(((p.get('liquidity') or {}).get('usd')))
-            if vol is None or liq is None: continue
-            if vol<volume_min or vol>volume_max: continue
-            if liq<liq_min_usd: continue
-            inline_mcap = safe_float(p.get('marketCap')) or safe_float(p.get('fdv'))
-            if inline_mcap is not None and not (mcap_min<=inline_mcap<=mcap_max): continue
-            prefiltered.append(p)
-        time.sleep(page_delay_s)
+    errors=[]
+    sem = asyncio.Semaphore(SEARCH_WORKERS)  # seeds может быть сотни (max_pages<=0) — не шлём их одной пачкой
+    # страницы не разносим паузами: page_delay_s задаёт темп только после недавнего 429 (AsyncDexClient.throttle)
+    results = await asyncio.gather(*(_fetch_seed_page(dex, i, seeds, page_delay_s, sem) for i in range(1,len(seeds)+1)),
+                                   return_exceptions=True)
+    # gather сохраняет порядок страниц, так что выбор лучшей пары не зависит от сети;
+    # solana-пары всех страниц сразу складываем в один список для _prefilter
+    pairs: List[Dict[str, Any]] = []
+    for idx, res in enumerate(results, 1):
+        if isinstance(res, BaseException):
+            if not isinstance(res, Exception): raise res  # CancelledError и т.п. не глотаем
+            errors.append({"seed": seeds[idx-1], "page": idx, "error": str(res)})
+            continue
+        pairs.extend(res)
+    fetched = len(pairs)
+    prefiltered = _prefilter(pairs, volume_min=volume_min, volume_max=volume_max,
+                             liq_min_usd=liq_min_usd, mcap_min=mcap_min, mcap_max=mcap_max)
     best = select_best_pair_by_token(prefiltered)
     now_iso = _dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    rows,stats = filter_candidates(best.values(), dex=dex, vol_min=volume_min, vol_max=volume_max,
-                                   pct_threshold=price_threshold_pct, liq_min_usd=liq_min_usd,
-                                   mcap_min=mcap_min, mcap_max=mcap_max, st=st,
-                                   use_proxy_poolmax=use_proxy_poolmax, now_iso=now_iso)
+    rows,stats = await filter_candidates(best.values(), dex=dex, vol_min=volume_min, vol_max=volume_max,
+                                         pct_threshold=price_threshold_pct, liq_min_usd=liq_min_usd,
+                                         mcap_min=mcap_min, mcap_max=mcap_max, st=st,
+                                         use_proxy_poolmax=use_proxy_poolmax, now_iso=now_iso,
+                                         cache={}, ath_cache={})
     stats.update({"search_pairs":fetched, "prefilter":len(prefiltered), "unique_tokens":len(best), "candidates_after_threshold":len(rows)})
-    out = {"stats":stats, "rows":[asdict(r) for r in rows], "st_enabled": bool(st_api_key)}
+    out = {"stats":stats, "rows":[pair_row_dict(r) for r in rows], "st_enabled": bool(st_api_key)}
     if debug:
         out["errors"] = errors
         out["used_seeds"] = seeds